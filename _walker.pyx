@@ -0,0 +1,103 @@
+# cython: language_level=3
+"""Compiled version of lalz.walk_statement
+
+Optional: build it in place with `cythonize -i _walker.pyx` and lalz.py picks
+it up automatically; without it the pure-Python walker in lalz.py is used.
+Keep the logic in sync with lalz.walk_statement.
+"""
+import sqlparse
+
+# sqlparse types used in the hot token checks, bound once at import
+cdef object Identifier = sqlparse.sql.Identifier
+cdef object IdentifierList = sqlparse.sql.IdentifierList
+cdef object Comparison = sqlparse.sql.Comparison
+cdef object Where = sqlparse.sql.Where
+cdef object Keyword = sqlparse.tokens.Keyword
+
+def walk_statement(parsed_query, list tables, dict alias_to_table, list columns,
+                   list join_tokens, list where_tokens):
+    """Extract tables, columns and condition tokens from a statement in one pass
+
+    Same contract as lalz.walk_statement: results are appended to the given
+    lists (and alias mapping) and the return value says whether the statement
+    contains a UNION.
+    """
+    cdef bint has_union = False
+    # Track if we've seen an ON keyword (indicates next Comparison is a JOIN condition)
+    cdef bint expecting_join_condition = False
+    cdef bint want_tables, want_columns, want_conditions
+    cdef bint tables_here, columns_here, conditions_here
+    cdef object token, tokens, alias, identifier
+    cdef str keyword, token_str, full_table_name
+    cdef tuple frame
+
+    cdef list stack = [(iter(parsed_query.tokens), True, True, True)]
+    while stack:
+        frame = stack[-1]
+        tokens, want_tables, want_columns, want_conditions = frame
+        for token in tokens:
+            if token.ttype is Keyword:
+                keyword = token.normalized
+                # Check if query contains UNION (keyword tokens only, so literals and names don't match)
+                if keyword.startswith('UNION'):
+                    has_union = True
+                # Check if this is an ON keyword
+                elif keyword == 'ON' and want_conditions:
+                    expecting_join_condition = True
+                # Plain keywords have no children and are never tables, columns or conditions
+                continue
+
+            tables_here = want_tables
+            columns_here = want_columns
+            conditions_here = want_conditions
+
+            # Extract table names and build alias mapping
+            if tables_here and isinstance(token, Identifier):
+                tables_here = False
+                token_str = str(token).strip()
+
+                alias = token.get_alias()
+                if alias is not None:
+                    # token_str format: "schema.table alias" or "table alias"
+                    if ' ' in token_str:
+                        full_table_name = token_str.rsplit(None, 1)[0]
+                    else:
+                        full_table_name = token.get_real_name()
+
+                    alias_to_table[alias] = full_table_name
+                else:
+                    # No alias - use the full token string as-is
+                    full_table_name = token_str
+
+                tables.append(full_table_name)
+
+            # Extract column names
+            if columns_here and isinstance(token, IdentifierList):
+                columns_here = False
+                for identifier in token.get_identifiers():
+                    if isinstance(identifier, Identifier):
+                        columns.append(identifier.get_real_name())
+                    else:
+                        columns.append(str(identifier).strip())
+
+            if conditions_here:
+                # Extract JOIN conditions (Comparison tokens after ON keyword)
+                if isinstance(token, Comparison) and expecting_join_condition:
+                    conditions_here = False
+                    join_tokens.append(token)
+                    expecting_join_condition = False
+
+                # Extract WHERE conditions (Comparison tokens inside Where clause)
+                elif isinstance(token, Where):
+                    conditions_here = False
+                    where_tokens.append(token)
+
+            # Descend into nested tokens; this level resumes once the child is done
+            if hasattr(token, 'tokens'):
+                stack.append((iter(token.tokens), tables_here, columns_here, conditions_here))
+                break
+        else:
+            # This level is exhausted
+            stack.pop()
+
+    return has_union
@@ -0,0 +1,98 @@
+"""Differential fuzz test of lalz's fast paths against the sqlparse walk
+
+Generates random simple queries (many using keywords as names), and for every
+query the trivial-query regex or the fast scanner accepts checks that it returns
+exactly what the sqlparse walk returns. Exits with status 1 on any mismatch.
+
+    python3 fuzz_fast_path.py [--seed N] [--count N]
+"""
+import argparse
+import random
+import sys
+
+import sqlparse
+
+import lalz
+
+# Plain names plus words sqlparse lexes as keywords in some positions
+PLAIN_NAMES = ['a', 'b', 't', 'x', 'id', 'o', 's', 'tab_a', 'Orders', 'k1', '_u',
+               'order_id', 'fromx', 'nowhere', 'status', 'data']
+KEYWORD_NAMES = ['asc', 'desc', 'in', 'values', 'using', 'from', 'as', 'case', 'nulls',
+                 'straight', 'natural', 'handler', 'go', 'at', 'with', 'end', 'key',
+                 'first', 'last', 'level', 'user', 'name', 'value', 'date', 'text', 'type',
+                 'zone', 'result', 'count', 'select', 'where', 'on', 'join', 'left', 'like']
+OPERATORS = ['=', '<>', '!=', '<', '>', '<=', '>=', 'LIKE']
+LITERALS = ['1', '42', '3.5', "'x'", "'a.b'", "'WHERE'", "'it''s'", "'o.id'", "''",
+            r"'a\'", r"'C:\\'", r"'x\\y'"]
+JOINS = ['JOIN', 'INNER JOIN', 'LEFT JOIN', 'LEFT OUTER JOIN', 'right join',
+         'FULL OUTER JOIN', 'CROSS JOIN', 'LEFT  JOIN']
+
+def generate_query(rng):
+    """Build one random query in (or close to) the fast path's grammar"""
+    def space():
+        return rng.choice([' ', ' ', '  ', '\n', '\n    ', '\t'])
+
+    def word():
+        return rng.choice(KEYWORD_NAMES if rng.random() < 0.3 else PLAIN_NAMES)
+
+    def name(parts=None):
+        return '.'.join(word() for _ in range(parts or rng.choice([1, 1, 2, 2, 3])))
+
+    def operand():
+        return name() if rng.random() < 0.6 else rng.choice(LITERALS)
+
+    def comparison():
+        return operand() + rng.choice(['', ' ']) + rng.choice(OPERATORS) + rng.choice(['', ' ']) + operand()
+
+    def conditions(separators):
+        text = comparison()
+        for _ in range(rng.choice([0, 0, 1, 2])):
+            text += space() + rng.choice(separators) + space() + comparison()
+        return text
+
+    def table():
+        text = name(rng.choice([1, 1, 2]))
+        if rng.random() < 0.6:
+            text += space() + rng.choice(['', '', '', 'AS ']) + word()
+        return text
+
+    query = rng.choice(['SELECT', 'select']) + space()
+    query += rng.choice(['*', ', '.join(name() for _ in range(rng.choice([1, 1, 2, 3])))])
+    query += space() + rng.choice(['FROM', 'from']) + space() + table()
+    for _ in range(rng.choice([0, 1, 1, 2])):
+        join = rng.choice(JOINS)
+        query += space() + join + space() + table()
+        if 'CROSS' not in join or rng.random() < 0.2:
+            query += space() + 'ON' + space() + conditions(['AND', 'and'])
+    if rng.random() < 0.7:
+        query += space() + rng.choice(['WHERE', 'where']) + space() + conditions(['AND', 'OR'])
+    if rng.random() < 0.6:
+        query += rng.choice([';', ' ;'])
+    return query
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default 0)")
+    parser.add_argument('--count', type=int, default=20000, help="queries to generate (default 20000)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    accepted = mismatches = 0
+    for _ in range(args.count):
+        query = generate_query(rng)
+        results = {'trivial': lalz._trivial_extract(query), 'fast': lalz._fast_extract(query)}
+        if results['trivial'] is None and results['fast'] is None:
+            continue
+        accepted += 1
+        expected = lalz.extract_sql_info_parsed(sqlparse.parse(query)[0])
+        for path, result in results.items():
+            if result is not None and result != expected:
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"MISMATCH ({path}) {query!r}\n  got:      {result}\n  sqlparse: {expected}")
+
+    print(f"{args.count} queries, {accepted} on a fast path, {mismatches} mismatches")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,44 +1,96 @@
 import sqlparse
+import contextlib
 import csv
+import functools
+import io
+import mmap
+import multiprocessing
 import os
+import re
+from collections import deque
 from datetime import datetime
 
-def extract_sql_info(sql_query):
-    # Parse the SQL query
-    parsed_query = sqlparse.parse(sql_query)[0]
-    
-    # Check if query contains UNION
-    has_union = 'UNION' in sql_query.upper()
+# sqlparse types used in the hot token checks, bound once at import
+_Identifier = sqlparse.sql.Identifier
+_IdentifierList = sqlparse.sql.IdentifierList
+_Comparison = sqlparse.sql.Comparison
+_Where = sqlparse.sql.Where
+_Keyword = sqlparse.tokens.Keyword
+_Name = sqlparse.tokens.Name
 
-    # Extract table names and build alias mapping
-    tables = []
-    alias_to_table = {}
+def _render_condition(token, alias_map, remove=None):
+    """Render a condition token, replacing alias prefixes (alias.column) with table names
+
+    Works on the token's leaves, so only real alias names directly followed by a
+    dot are replaced (never text inside string literals or longer names).
+    Occurrences of remove are deleted from the query text before the table
+    names are put in, so the table names themselves are never cut.
+    """
+    parts = []
+    previous = None
+    for leaf in token.flatten():
+        value = leaf.value
+        if value == '.' and previous is not None and previous.ttype is _Name and previous.value in alias_map:
+            parts[-1] = alias_map[previous.value]
+        parts.append(value.replace(remove, '') if remove else value)
+        previous = leaf
+    return ''.join(parts)
+
+def walk_statement(parsed_query, tables, alias_to_table, columns, join_tokens, where_tokens,
+                   Identifier=_Identifier, IdentifierList=_IdentifierList,
+                   Comparison=_Comparison, Where=_Where, Keyword=_Keyword):
+    """Extract tables, columns and condition tokens from a statement in one pass
+
+    Results are appended to the given lists (and alias mapping); returns whether
+    the statement contains a UNION. The token tree is walked depth first with an
+    explicit stack instead of recursion, so deeply nested queries cannot hit the
+    recursion limit. Each stack entry carries flags saying which collectors are
+    still looking inside that subtree (each one stops descending where it found
+    its match); every subtree is still visited so UNION keywords are found anywhere.
+    The sqlparse types are default arguments so lookups are local (LOAD_FAST).
+    """
+    has_union = False
     
-    def extract_from_tokens(tokens):
-        """Recursively extract tables from tokens"""
+    # Track if we've seen an ON keyword (indicates next Comparison is a JOIN condition)
+    expecting_join_condition = False
+    
+    stack = deque([(iter(parsed_query.tokens), True, True, True)])
+    while stack:
+        tokens, want_tables, want_columns, want_conditions = stack[-1]
         for token in tokens:
-            if isinstance(token, sqlparse.sql.Identifier):
-                # Get the full token string
+            if token.ttype is Keyword:
+                keyword = token.normalized
+                # Check if query contains UNION (keyword tokens only, so literals and names don't match)
+                if keyword.startswith('UNION'):
+                    has_union = True
+                # Check if this is an ON keyword
+                elif keyword == 'ON' and want_conditions:
+                    expecting_join_condition = True
+                # Plain keywords have no children and are never tables, columns or conditions
+                continue
+            
+            tables_here = want_tables
+            columns_here = want_columns
+            conditions_here = want_conditions
+            
+            # Extract table names and build alias mapping
+            if tables_here and isinstance(token, Identifier):
+                tables_here = False
+                # Get the full token string (rendered once, sqlparse re-walks children on str())
                 token_str = str(token).strip()
                 
-                # Check if there's an alias
-                if token.has_alias():
-                    alias = token.get_alias()
-                    # Get the real table name (without alias)
-                    table_name = token.get_real_name()
-                    
+                # Check if there's an alias (has_alias() would compute get_alias() a second time)
+                alias = token.get_alias()
+                if alias is not None:
                     # Check if it has schema.table format by looking at the token structure
                     # token_str format: "schema.table alias" or "table alias"
                     # We need to extract everything before the alias
                     if ' ' in token_str:
-                        # Split by spaces and remove the last part (alias)
-                        parts = token_str.rsplit(None, 1)  # Split from right, max 1 split
-                        if len(parts) == 2:
-                            full_table_name = parts[0]  # Everything before the alias
-                        else:
-                            full_table_name = table_name
+                        # Split from the right and drop the last part (alias)
+                        full_table_name = token_str.rsplit(None, 1)[0]
                     else:
-                        full_table_name = table_name
+                        # Get the real table name (without alias)
+                        full_table_name = token.get_real_name()
                     
                     alias_to_table[alias] = full_table_name
                 else:
@@ -46,86 +98,383 @@ def extract_sql_info(sql_query):
                     full_table_name = token_str
                 
                 tables.append(full_table_name)
-            elif hasattr(token, 'tokens'):
-                # Recursively search nested tokens (for UNION queries)
-                extract_from_tokens(token.tokens)
-    
-    extract_from_tokens(parsed_query.tokens)
-
-    # Extract column names
-    columns = []
-    
-    def extract_columns_from_tokens(tokens):
-        """Recursively extract columns from tokens"""
-        for token in tokens:
-            if isinstance(token, sqlparse.sql.IdentifierList):
+            
+            # Extract column names
+            if columns_here and isinstance(token, IdentifierList):
+                columns_here = False
                 for identifier in token.get_identifiers():
                     # Check if it's an Identifier object before calling get_real_name()
-                    if isinstance(identifier, sqlparse.sql.Identifier):
+                    if isinstance(identifier, Identifier):
                         columns.append(identifier.get_real_name())
                     else:
                         # For Token objects, just use the string value
                         columns.append(str(identifier).strip())
-            elif hasattr(token, 'tokens'):
-                # Recursively search nested tokens
-                extract_columns_from_tokens(token.tokens)
+            
+            if conditions_here:
+                # Extract JOIN conditions (Comparison tokens after ON keyword)
+                if isinstance(token, Comparison) and expecting_join_condition:
+                    conditions_here = False
+                    join_tokens.append(token)
+                    expecting_join_condition = False
+                
+                # Extract WHERE conditions (Comparison tokens inside Where clause)
+                elif isinstance(token, Where):
+                    conditions_here = False
+                    where_tokens.append(token)
+            
+            # Descend into nested tokens (for UNION queries and subqueries); the
+            # rest of this level resumes from its iterator once the child is done
+            if hasattr(token, 'tokens'):
+                stack.append((iter(token.tokens), tables_here, columns_here, conditions_here))
+                break
+        else:
+            # This level is exhausted
+            stack.pop()
     
-    extract_columns_from_tokens(parsed_query.tokens)
+    return has_union
 
-    # Extract JOIN conditions and WHERE conditions
-    join_conditions = []
-    where_conditions = []
+try:
+    # Compiled walker with the same contract, if built (cythonize -i _walker.pyx)
+    from _walker import walk_statement
+except ImportError:
+    pass
+
+def extract_sql_info_parsed(parsed_query):
+    """Extract tables, columns and conditions from an already parsed statement"""
+    tables = []
+    alias_to_table = {}
+    columns = []
+    join_tokens = []
+    where_tokens = []
     
-    # Track if we've seen an ON keyword (indicates next Comparison is a JOIN condition)
-    expecting_join_condition = False
+    has_union = walk_statement(parsed_query, tables, alias_to_table, columns, join_tokens, where_tokens)
     
-    def extract_conditions_from_tokens(tokens):
-        """Recursively extract conditions from tokens"""
-        nonlocal expecting_join_condition
-        
-        for token in tokens:
-            # Check if this is an ON keyword
-            if token.ttype is sqlparse.tokens.Keyword and token.value.upper() == 'ON':
-                expecting_join_condition = True
-            
-            # Extract JOIN conditions (Comparison tokens after ON keyword)
-            elif isinstance(token, sqlparse.sql.Comparison) and expecting_join_condition:
-                join_conditions.append(str(token).strip())
-                expecting_join_condition = False
-            
-            # Extract WHERE conditions (Comparison tokens inside Where clause)
-            elif isinstance(token, sqlparse.sql.Where):
-                where_str = str(token).replace('WHERE', '').strip()
-                where_conditions.append(where_str)
-            
-            # Recursively search nested tokens
-            elif hasattr(token, 'tokens'):
-                extract_conditions_from_tokens(token.tokens)
+    # Render conditions, replacing aliases with actual table names from the tokens
+    # (the alias mapping is complete once the walk is done)
+    if alias_to_table:
+        join_conditions = [_render_condition(token, alias_to_table).strip() for token in join_tokens]
+        where_conditions = [_render_condition(token, alias_to_table, remove='WHERE').strip()
+                            for token in where_tokens]
+    else:
+        join_conditions = [str(token).strip() for token in join_tokens]
+        where_conditions = [str(token).replace('WHERE', '').strip() for token in where_tokens]
     
-    extract_conditions_from_tokens(parsed_query.tokens)
+    conditions = where_conditions
+
+    # Return tuples so memoized results can be shared safely between callers
+    return tuple(tables), tuple(columns), tuple(join_conditions), tuple(conditions), has_union
+
+# Words sqlparse's default lexer treats as keywords; the fast scanner only accepts
+# names that sqlparse would also lex as plain names
+_SQLPARSE_KEYWORDS = frozenset().union(
+    sqlparse.keywords.KEYWORDS_COMMON, sqlparse.keywords.KEYWORDS_ORACLE,
+    sqlparse.keywords.KEYWORDS_MYSQL, sqlparse.keywords.KEYWORDS_PLPGSQL,
+    sqlparse.keywords.KEYWORDS_HQL, sqlparse.keywords.KEYWORDS_MSACCESS,
+    sqlparse.keywords.KEYWORDS_SNOWFLAKE, sqlparse.keywords.KEYWORDS_BIGQUERY,
+    sqlparse.keywords.KEYWORDS)
+
+# Keywords the lexer matches by regex (sqlparse.keywords.SQL_REGEX) before its rules
+# for names next to a dot, so they are keywords even inside dotted names (t.in, from.x)
+_DOTTED_KEYWORDS = frozenset({'CASE', 'IN', 'VALUES', 'USING', 'FROM', 'AS'})
+
+# First words of the lexer's other keyword regexes (ASC/DESC, NULLS FIRST, STRAIGHT JOIN, ...);
+# these only apply to bare words, parts of dotted names are always names
+_REGEX_KEYWORDS = frozenset({
+    'LEFT', 'RIGHT', 'FULL', 'INNER', 'OUTER', 'STRAIGHT', 'CROSS', 'NATURAL', 'JOIN',
+    'END', 'NOT', 'ASC', 'DESC', 'NULLS', 'UNION', 'CREATE', 'DOUBLE', 'GROUP', 'ORDER',
+    'PRIMARY', 'HANDLER', 'GO', 'LATERAL', 'AT', 'WITH', 'LIKE', 'ILIKE', 'RLIKE', 'REGEXP'})
+
+# Bare words sqlparse never lexes as plain names
+_NOT_BARE_NAMES = _SQLPARSE_KEYWORDS | _DOTTED_KEYWORDS | _REGEX_KEYWORDS
+
+def _is_plain_name(parts):
+    """Whether sqlparse lexes a name, given as its upper-cased dot-separated parts, as plain names"""
+    if len(parts) == 1:
+        return parts[0] not in _NOT_BARE_NAMES
+    return _DOTTED_KEYWORDS.isdisjoint(parts)
+
+# Tokens understood by the fast scanner (one group per kind); anything else
+# (comments, quoted names, parentheses, placeholders, ...) falls back to sqlparse.
+# Strings with a backslash are left to sqlparse too, its lexer reads \' as an escaped quote
+_FAST_TOKEN_RE = re.compile(
+    r"(\s+)|('(?:[^'\\]|'')*')|(\d+(?:\.\d+)?\b)|([A-Za-z_]\w*)|(<>|!=|<=|>=|=|<|>)|([.,;*])|(.)", re.S)
+_SPACE, _STRING, _NUMBER, _WORD, _COMPARISON_OP, _PUNCT, _OTHER = range(1, 8)
+
+# JOIN keyword sequences the fast scanner accepts
+_FAST_JOINS = {('JOIN',), ('INNER', 'JOIN'), ('CROSS', 'JOIN'),
+               ('LEFT', 'JOIN'), ('LEFT', 'OUTER', 'JOIN'),
+               ('RIGHT', 'JOIN'), ('RIGHT', 'OUTER', 'JOIN'),
+               ('FULL', 'JOIN'), ('FULL', 'OUTER', 'JOIN')}
+
+# SELECT <* or plain names> FROM <table> [;] with nothing else, the most common trivial query
+_PLAIN_NAME = r'[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*'
+_TRIVIAL_SELECT_RE = re.compile(
+    rf'\s*SELECT\s+(\*|{_PLAIN_NAME}(?:\s*,\s*{_PLAIN_NAME})*)\s+FROM\s+({_PLAIN_NAME})\s*;?\s*',
+    re.IGNORECASE)
+
+def _trivial_extract(sql_query):
+    """Extract info from trivial single-table queries with one regex match, or return None
+
+    Produces the same result as the sqlparse walk: select-list names are listed
+    with the tables, and a list of two or more names also yields their columns.
+    """
+    match = _TRIVIAL_SELECT_RE.fullmatch(sql_query)
+    if match is None:
+        return None
+    select_list, table_name = match.groups()
+    names = [] if select_list == '*' else [name.strip() for name in select_list.split(',')]
+    names.append(table_name)
+    for name in names:
+        if not _is_plain_name(name.upper().split('.')):
+            # A keyword is not a name for sqlparse
+            return None
+    # Like sqlparse's get_real_name(), the real name is the part after the first dot
+    columns = tuple(name.split('.')[1] if '.' in name else name for name in names[:-1])
+    return tuple(names), columns if len(columns) > 1 else (), (), (), False
+
+class _NotSimple(Exception):
+    """Raised by the fast scanner for queries it leaves to sqlparse"""
+
+def _fast_extract(sql_query):
+    """Extract info from simple queries in one linear scan, without sqlparse
+
+    Handles SELECT <names or *> FROM <table> [[type] JOIN <table> [ON <comparisons>]]...
+    [WHERE <comparisons>] [;] where comparisons compare names, numbers and
+    strings joined by AND/OR, and produces exactly what the sqlparse walk
+    produces for them. Returns None for anything else (UNION, subqueries,
+    functions, comments, GROUP BY, ...) so the caller falls back to sqlparse.
+    """
+    tokens = []
+    for match in _FAST_TOKEN_RE.finditer(sql_query):
+        kind = match.lastindex
+        if kind == _SPACE:
+            continue
+        if kind == _OTHER:
+            return None
+        tokens.append((kind, match.group().upper() if kind == _WORD else match.group(),
+                       match.start(), match.end()))
+    tokens.append((None, '', len(sql_query), len(sql_query)))  # End marker
     
-    # Replace aliases with actual table names in conditions
-    def replace_aliases(condition_str, alias_map):
-        result = condition_str
-        # Sort aliases by length (descending) to avoid partial replacements
-        for alias in sorted(alias_map.keys(), key=len, reverse=True):
-            # Replace alias. prefix with table_name. prefix
-            result = result.replace(f"{alias}.", f"{alias_map[alias]}.")
-        return result
+    pos = 0
+    tables = []
+    alias_to_table = {}
+    qualifiers = []  # (start, end, name) of every name part directly followed by a dot
     
-    join_conditions = [replace_aliases(cond, alias_to_table) for cond in join_conditions]
-    where_conditions = [replace_aliases(cond, alias_to_table) for cond in where_conditions]
+    def expect(*words):
+        nonlocal pos
+        for word in words:
+            if tokens[pos][0] != _WORD or tokens[pos][1] != word:
+                raise _NotSimple
+            pos += 1
     
-    conditions = where_conditions
+    def name():
+        """Read a (dotted) name, returning (start, end, real name)
 
-    return tables, columns, join_conditions, conditions, has_union
+        Like sqlparse's get_real_name(), the real name is the part after the first dot.
+        """
+        nonlocal pos
+        kind, _, start, end = tokens[pos]
+        if kind != _WORD:
+            raise _NotSimple
+        first = pos
+        pos += 1
+        parts = [tokens[first][1]]
+        # schema.table / alias.column: every part must directly follow its dot
+        while tokens[pos][1] == '.' and tokens[pos][2] == end:
+            if tokens[pos + 1][0] != _WORD or tokens[pos + 1][2] != tokens[pos][3]:
+                raise _NotSimple
+            qualifiers.append((tokens[pos - 1][2], end, sql_query[tokens[pos - 1][2]:end]))
+            parts.append(tokens[pos + 1][1])
+            end = tokens[pos + 1][3]
+            pos += 2
+        if not _is_plain_name(parts):
+            # A keyword is not a name for sqlparse
+            raise _NotSimple
+        if pos == first + 1:
+            return start, end, sql_query[start:end]
+        return start, end, sql_query[tokens[first + 2][2]:tokens[first + 2][3]]
+    
+    def comparisons(separators):
+        """Read comparisons joined by the separator keywords, returning the first one's span"""
+        nonlocal pos
+        first_span = None
+        while True:
+            start = None
+            for side in (0, 1):
+                if side:
+                    if tokens[pos][0] != _COMPARISON_OP:
+                        raise _NotSimple
+                    pos += 1
+                kind, _, operand_start, operand_end = tokens[pos]
+                if kind in (_STRING, _NUMBER):
+                    pos += 1
+                else:
+                    operand_start, operand_end, _ = name()
+                    tables.append(sql_query[operand_start:operand_end])
+                if start is None:
+                    start = operand_start
+            if first_span is None:
+                first_span = (start, operand_end)
+            if tokens[pos][0] != _WORD or tokens[pos][1] not in separators:
+                return first_span
+            pos += 1
+    
+    def render(start, end, remove=None):
+        """Source text between start and end with alias prefixes replaced by table names
 
-def process_csv_file(file_path, output_dir="query_outputs"):
-    """Read CSV file and process queries from each cell"""
+        Occurrences of remove are deleted from the source text, not from the table names.
+        """
+        parts = []
+        if alias_to_table:
+            for qualifier_start, qualifier_end, qualifier in qualifiers:
+                if start <= qualifier_start < end and qualifier in alias_to_table:
+                    parts.append(sql_query[start:qualifier_start])
+                    parts.append(alias_to_table[qualifier])
+                    start = qualifier_end
+        parts.append(sql_query[start:end])
+        if remove:
+            parts[::2] = [part.replace(remove, '') for part in parts[::2]]
+        return ''.join(parts)
+    
+    def table():
+        """Read a table with an optional alias"""
+        nonlocal pos
+        start, end, real_name = name()
+        kind, word, alias_start, alias_end = tokens[pos]
+        if kind == _WORD and _is_plain_name((word,)):
+            pos += 1
+            alias = sql_query[alias_start:alias_end]
+            # Everything before the alias, or the bare table name when no space separates them
+            full_table_name = sql_query[start:end] if ' ' in sql_query[end:alias_start] else real_name
+            alias_to_table[alias] = full_table_name
+            tables.append(full_table_name)
+        else:
+            tables.append(sql_query[start:end])
+    
+    try:
+        expect('SELECT')
+        
+        # Select list: * or names; a list of two or more names also yields columns
+        columns = []
+        if tokens[pos][1] == '*':
+            pos += 1
+        else:
+            while True:
+                start, end, real_name = name()
+                tables.append(sql_query[start:end])
+                columns.append(real_name)
+                if tokens[pos][1] != ',':
+                    break
+                pos += 1
+            if len(columns) == 1:
+                columns = []
+        
+        expect('FROM')
+        table()
+        
+        join_spans = []
+        while tokens[pos][0] == _WORD and tokens[pos][1] != 'WHERE':
+            join_words = []
+            while tokens[pos][0] == _WORD and tokens[pos][1] in ('INNER', 'CROSS', 'LEFT', 'RIGHT', 'FULL', 'OUTER', 'JOIN'):
+                join_words.append(tokens[pos][1])
+                pos += 1
+                if join_words[-1] == 'JOIN':
+                    break
+            if tuple(join_words) not in _FAST_JOINS:
+                raise _NotSimple
+            table()
+            if tokens[pos][0] == _WORD and tokens[pos][1] == 'ON':
+                pos += 1
+                join_spans.append(comparisons(('AND',)))
+        
+        where_start = None
+        if tokens[pos][0] == _WORD:
+            where_start = tokens[pos][2]
+            expect('WHERE')
+            comparisons(('AND', 'OR'))
+        
+        if tokens[pos][1] == ';':
+            pos += 1
+        if tokens[pos][0] is not None:
+            raise _NotSimple
+    except _NotSimple:
+        return None
+    
+    join_conditions = [render(start, end).strip() for start, end in join_spans]
+    where_conditions = []
+    if where_start is not None:
+        # The WHERE clause runs to the end of the statement (including the semicolon)
+        where_conditions.append(render(where_start, len(sql_query), remove='WHERE').strip())
+    
+    return tuple(tables), tuple(columns), tuple(join_conditions), tuple(where_conditions), False
+
+@functools.lru_cache(maxsize=4096)
+def extract_sql_info_text(sql_query):
+    """Parse a single SQL query and extract its tables, columns and conditions"""
+    # Trivial and simple queries are handled without sqlparse, everything else by it
+    result = _trivial_extract(sql_query) or _fast_extract(sql_query)
+    if result is None:
+        result = extract_sql_info_parsed(sqlparse.parse(sql_query)[0])
+    return result
+
+# Text entry point kept under its original name
+extract_sql_info = extract_sql_info_text
+
+def clear_cache():
+    """Drop all memoized extract_sql_info results (for long-running processes)"""
+    extract_sql_info_text.cache_clear()
+
+def canonicalize_query(sql_query):
+    """Strip surrounding whitespace so padded duplicates hit the cache
+
+    Only whitespace outside the query is removed: anything inside it (such as
+    trailing spaces in a multi-line string literal) is part of the output.
+    """
+    return sql_query.strip()
+
+# Queries handed to a worker process at a time when parsing in parallel
+PARALLEL_CHUNKSIZE = 32
+
+def _extract_query(query):
+    """Extract info from query text or a parsed statement, returning (result, error)
+
+    Errors are returned as strings rather than raised so one bad query does not
+    abort a multiprocessing.Pool map (and so results are always picklable).
+    """
+    try:
+        if isinstance(query, str):
+            return extract_sql_info_text(query), None
+        return extract_sql_info_parsed(query), None
+    except Exception as e:
+        return None, str(e)
+
+def read_sql_file(file_path):
+    """Read a SQL/TXT file through a read-only memory map
+
+    The text is decoded straight from the mapped pages, so no intermediate
+    bytes copy of the whole file is held next to the decoded string.
+    """
+    with open(file_path, 'rb') as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files cannot be mapped, and some platforms/filesystems don't support it
+            content = file.read().decode('utf-8')
+        else:
+            with mapped:
+                content = str(mapped, 'utf-8')
+    
+    # Same newline handling as reading the file in text mode
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+def read_csv_queries(file_path):
+    """Read CSV file and return (query, location) for the queries in each cell"""
     try:
         all_queries = []
         
-        with open(file_path, 'r', encoding='utf-8') as csvfile:
+        with open(file_path, 'r', encoding='utf-8', buffering=1 << 20) as csvfile:
             reader = csv.reader(csvfile)
             for row_idx, row in enumerate(reader, 1):
                 for col_idx, cell in enumerate(row, 1):
@@ -133,110 +482,194 @@ def process_csv_file(file_path, output_dir="query_outputs"):
                         # Split queries in this cell
                         cell_queries = sqlparse.split(cell)
                         for query in cell_queries:
-                            query = query.strip()
+                            query = canonicalize_query(query)
                             if query:
                                 # Store query with its location
-                                all_queries.append({
-                                    'query': query,
-                                    'location': f"Row {row_idx}, Col {col_idx}"
-                                })
+                                all_queries.append((query, f"Row {row_idx}, Col {col_idx}"))
         
         return all_queries
     except Exception as e:
         print(f"Error reading CSV file: {e}")
         return []
 
-def process_sql_file(file_path, output_dir="query_outputs"):
-    """Read SQL/TXT/CSV file and process each query separately"""
+# -- comments (up to the end of the line) and line breaks with their surrounding indentation
+_COMMENT_RE = re.compile(r'--[^\n]*')
+_LINE_BREAK_RE = re.compile(r'\s*\n\s*')
+
+# Columns written for every query
+CSV_HEADER = ['Query', 'Table Names', 'JOIN Conditions', 'WHERE Conditions']
+
+def _csv_line(row):
+    """Format one row exactly as csv.writer writes it"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+# Header of the per-query files, formatted once
+CSV_HEADER_LINE = _csv_line(CSV_HEADER)
+
+# Rows buffered in memory before each write to the --single-output file
+FLUSH_EVERY_ROWS = 1000
+
+def format_csv_row(query, tables, join_conditions, where_conditions):
+    """Build the CSV data row for one query"""
+    # Remove SQL comments (-- style) and join the remaining lines into one
+    query_text = _LINE_BREAK_RE.sub(' ', _COMMENT_RE.sub('', query)).strip()
+
+    # Join with comma and newline for each item to appear on separate line in CSV cell
+    # Filter out None values and convert all to strings
+    table_names = ',\n'.join([str(t) for t in tables if t is not None])
+    join_conds = ',\n'.join([str(j) for j in join_conditions if j is not None]) if join_conditions else 'No JOIN conditions'
+    where_conds = ',\n'.join([str(w) for w in where_conditions if w is not None]) if where_conditions else 'No WHERE conditions'
+    
+    return [query_text, table_names, join_conds, where_conds]
+
+def process_sql_file(file_path, output_dir="query_outputs", single_output=False, workers=1):
+    """Read SQL/TXT/CSV file and process each query separately
+
+    With single_output=True all queries go into one CSV file instead of one file per query.
+    With workers > 1 (or None for one per CPU) queries are parsed in a multiprocessing.Pool.
+    """
     try:
+        if workers is None:
+            workers = os.cpu_count() or 1
+        parallel = workers > 1
+        
         # Check file extension
         file_ext = os.path.splitext(file_path)[1].lower()
         
+        # Extraction results by query text, so identical queries are extracted only once
+        extracted = {}
+        
         if file_ext == '.csv':
             # Process CSV file
-            query_data = process_csv_file(file_path, output_dir)
-            queries = [q['query'] for q in query_data]
-            query_locations = [q['location'] for q in query_data]
+            query_entries = read_csv_queries(file_path)
         else:
             # Process SQL/TXT file
-            with open(file_path, 'r') as file:
-                content = file.read()
-            
-            # Split queries using sqlparse (handles semicolons properly)
-            statements = sqlparse.split(content)
-            
-            # Filter out empty statements
-            queries = [stmt.strip() for stmt in statements if stmt.strip()]
-            query_locations = [None] * len(queries)  # No location info for SQL files
+            content = read_sql_file(file_path)
+            query_entries = []  # No location info for SQL files
+            if parallel:
+                # Only split here (handles semicolons properly); the workers parse the text
+                for stmt in sqlparse.split(content):
+                    stmt = stmt.strip()
+                    if stmt:
+                        query_entries.append((stmt, None))
+            else:
+                # Split and parse in a single pass (handles semicolons properly); each
+                # statement is walked as it arrives so only its text and result are kept
+                for stmt in sqlparse.parsestream(content):
+                    query = str(stmt).strip()
+                    if query:
+                        query_entries.append((query, None))
+                        if query not in extracted:
+                            extracted[query] = _extract_query(stmt)
         
         # Create output directory if it doesn't exist
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
         
-        print(f"Found {len(queries)} queries in the file\n")
+        print(f"Found {len(query_entries)} queries in the file\n")
         print("=" * 80)
         
         # Get base filename without extension
         base_filename = os.path.splitext(os.path.basename(file_path))[0]
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        for idx, query in enumerate(queries, 1):
-            location = query_locations[idx - 1]
-            print(f"\n### QUERY {idx} ###")
-            if location:
-                print(f"Location: {location}")
-            print(f"Query Preview: {query[:100]}..." if len(query) > 100 else f"Query: {query}")
-            print("-" * 80)
+        # Per-query file names only differ in the query number
+        csv_path_prefix = os.path.join(output_dir, f"{base_filename}_query_")
+        csv_path_suffix = f"_{timestamp}.csv"
+        
+        with contextlib.ExitStack() as stack:
+            single_writer = None
+            if single_output:
+                # One shared, heavily buffered output file for all queries
+                single_csv_filename = os.path.join(output_dir, f"{base_filename}_{timestamp}.csv")
+                single_file = stack.enter_context(
+                    open(single_csv_filename, 'w', newline='', encoding='utf-8', buffering=8 * 1024 * 1024))
+                # Rows are formatted into memory and written out in batches
+                single_buffer = io.StringIO()
+                single_writer = csv.writer(single_buffer)
+                single_writer.writerow(['Query #'] + CSV_HEADER)
+                single_rows = 0
             
-            try:
-                tables, columns, join_conditions, where_conditions, has_union = extract_sql_info(query)
-                
-                if has_union:
-                    print("⚠️  UNION query detected - results include data from all SELECT statements")
-                
-                print(f"Tables: {tables}")
-                print(f"Columns: {columns}")
-                print(f"JOIN Conditions: {join_conditions}")
-                print(f"WHERE Conditions: {where_conditions}")
-                print("=" * 80)
+            # One writer formats the data row of every per-query file
+            row_buffer = io.StringIO()
+            row_writer = csv.writer(row_buffer)
+            
+            # Queries not extracted yet, each once (in order of first occurrence);
+            # repeats reuse the stored result
+            pending = list(dict.fromkeys(query for query, _ in query_entries if query not in extracted))
+            
+            if parallel and len(pending) > 1:
+                # Parse across CPU cores; imap keeps results in query order
+                pool = stack.enter_context(multiprocessing.Pool(workers))
+                results = pool.imap(_extract_query, pending, chunksize=PARALLEL_CHUNKSIZE)
+            else:
+                # Query text is parsed (and cached)
+                results = map(_extract_query, pending)
+            
+            for idx, (query, location) in enumerate(query_entries, 1):
+                print(f"\n### QUERY {idx} ###")
+                if location:
+                    print(f"Location: {location}")
+                print(f"Query Preview: {query[:100]}..." if len(query) > 100 else f"Query: {query}")
+                print("-" * 80)
                 
-                # Create CSV file for this query
-                csv_filename = f"{output_dir}/{base_filename}_query_{idx}_{timestamp}.csv"
-                with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
+                try:
+                    if query not in extracted:
+                        extracted[query] = next(results)
+                    info, error = extracted[query]
+                    if error is not None:
+                        print(f"Error processing query: {error}")
+                        print("=" * 80)
+                        continue
+                    tables, columns, join_conditions, where_conditions, has_union = info
                     
-                    # Write header
-                    writer.writerow(['Query', 'Table Names', 'JOIN Conditions', 'WHERE Conditions'])
+                    if has_union:
+                        print("⚠️  UNION query detected - results include data from all SELECT statements")
                     
-                    # Prepare data
-                    # Remove SQL comments (-- style) and format query
-                    query_lines = query.split('\n')
-                    cleaned_lines = []
-                    for line in query_lines:
-                        # Remove inline comments
-                        if '--' in line:
-                            line = line[:line.index('--')]
-                        line = line.strip()
-                        if line:  # Only add non-empty lines
-                            cleaned_lines.append(line)
-                    query_text = ' '.join(cleaned_lines)
+                    print(f"Tables: {list(tables)}")
+                    print(f"Columns: {list(columns)}")
+                    print(f"JOIN Conditions: {list(join_conditions)}")
+                    print(f"WHERE Conditions: {list(where_conditions)}")
+                    print("=" * 80)
                     
-                    # Join with comma and newline for each item to appear on separate line in CSV cell
-                    # Filter out None values and convert all to strings
-                    table_names = ',\n'.join([str(t) for t in tables if t is not None])
-                    join_conds = ',\n'.join([str(j) for j in join_conditions if j is not None]) if join_conditions else 'No JOIN conditions'
-                    where_conds = ',\n'.join([str(w) for w in where_conditions if w is not None]) if where_conditions else 'No WHERE conditions'
+                    row = format_csv_row(query, tables, join_conditions, where_conditions)
                     
-                    # Write data row
-                    writer.writerow([query_text, table_names, join_conds, where_conds])
-                
-                print(f"✓ Exported to: {csv_filename}")
-                
-            except Exception as e:
-                print(f"Error processing query: {e}")
-                print("=" * 80)
+                    if single_writer is not None:
+                        # Append to the shared output file
+                        single_writer.writerow([idx] + row)
+                        single_rows += 1
+                        if single_rows % FLUSH_EVERY_ROWS == 0:
+                            single_file.write(single_buffer.getvalue())
+                            single_buffer.seek(0)
+                            single_buffer.truncate()
+                        continue
+                    
+                    # Create CSV file for this query
+                    csv_filename = csv_path_prefix + str(idx) + csv_path_suffix
+                    # Format the data row in memory, then write header and row in one call
+                    row_buffer.seek(0)
+                    row_buffer.truncate()
+                    row_writer.writerow(row)
+                    
+                    with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
+                        csvfile.write(CSV_HEADER_LINE + row_buffer.getvalue())
+                    
+                    print(f"✓ Exported to: {csv_filename}")
+                    
+                except Exception as e:
+                    print(f"Error processing query: {e}")
+                    print("=" * 80)
+            
+            if single_writer is not None:
+                # Write out whatever is left in the buffer
+                single_file.write(single_buffer.getvalue())
         
-        print(f"\n✓ All CSV files saved to: {output_dir}/")
+        if single_output:
+            print(f"\n✓ All queries saved to: {single_csv_filename}")
+        else:
+            print(f"\n✓ All CSV files saved to: {output_dir}/")
                 
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found")
@@ -245,13 +678,31 @@ def process_sql_file(file_path, output_dir="query_outputs"):
 
 # Main execution
 if __name__ == "__main__":
-    import sys
+    import argparse
+    
+    def worker_count(value):
+        """argparse type for --workers: a non-negative number of processes"""
+        try:
+            count = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected a number, got {value!r}")
+        if count < 0:
+            raise argparse.ArgumentTypeError(f"must be 0 or more, got {count}")
+        return count
+    
+    parser = argparse.ArgumentParser(description="Extract tables, columns and JOIN/WHERE conditions from SQL queries")
+    parser.add_argument('file_path', nargs='?', help="SQL/TXT/CSV file to process (prompted for if omitted)")
+    parser.add_argument('--single-output', action='store_true',
+                        help="write every query into one CSV file")
+    parser.add_argument('--workers', type=worker_count, default=1, metavar='N',
+                        help="parse queries in N processes (0 = one per CPU)")
+    args = parser.parse_args()
     
-    if len(sys.argv) > 1:
+    if args.file_path:
         # File path provided as command line argument
-        file_path = sys.argv[1]
+        file_path = args.file_path
     else:
         # Prompt for file path
         file_path = input("Enter the path to SQL file (.sql or .txt): ").strip()
     
-    process_sql_file(file_path)
\ No newline at end of file
+    process_sql_file(file_path, single_output=args.single_output, workers=args.workers or None)